@@ -1,12 +1,68 @@
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.helpers.typing import ConfigType
-from homeassistant.const import EVENT_HOMEASSISTANT_START
-from .bluetooth import discover_bluetooth_devices, pair_device, connect_device, disconnect_device, _format_device
+from homeassistant.const import EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers.event import async_track_time_interval
+import voluptuous as vol
+
+from .bluetooth import (
+    discover_bluetooth_changes,
+    discover_bluetooth_devices,
+    pair_device,
+    connect_device,
+    disconnect_device,
+    _format_device,
+    async_expire_devices,
+    async_get_device_store,
+    async_get_advertisement_filter,
+)
+from .advertisement_filter import AdvertisementFilter
+from .registry import async_get_registry, normalize_mac
+from .scan_scheduler import REASON_USER_SCAN, async_get_scan_scheduler
+from .recorder import AdvertisementRecorder, AdvertisementReplay, ReplaySession, save_capture, load_capture
+from .const import (
+    CONF_MAC_ADDRESS,
+    CONF_RSSI_INTERVAL,
+    CONF_RSSI_THRESHOLD,
+    DATA_REPLAY_SESSION,
+    DATA_RSSI_SETTINGS,
+    DEFAULT_CAPTURE_FILE,
+    DEFAULT_DEVICE_STALE_AFTER,
+    DEFAULT_EXPIRY_INTERVAL,
+    DEFAULT_RECORD_DURATION,
+    DEFAULT_REPLAY_DISCOVER_INTERVAL,
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_RSSI_HYSTERESIS,
+    DEFAULT_RSSI_INTERVAL,
+    EVENT_REPLAY_COMPLETED,
+    PLATFORMS,
+    STATE_CONNECTED,
+    STATE_DISCONNECTED,
+)
+from datetime import timedelta
+import asyncio
 import logging
+import os
+import time
 
 DOMAIN = "bluetooth_speaker_control"
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(CONF_RSSI_THRESHOLD, default=DEFAULT_RSSI_HYSTERESIS): vol.All(
+                    vol.Coerce(int), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_RSSI_INTERVAL, default=DEFAULT_RSSI_INTERVAL): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
 MAX_STATE_LENGTH = 255  # Home Assistant's max entity state length
 
 def truncate_state(value):
@@ -18,6 +74,13 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Bluetooth Speaker Control integration."""
     _LOGGER.info("🔵 Initializing Bluetooth Speaker Control integration")
 
+    # RSSI hysteresis for live discovery and the speaker entities; replays take their own
+    conf = config.get(DOMAIN, {})
+    hass.data[DATA_RSSI_SETTINGS] = (
+        conf.get(CONF_RSSI_THRESHOLD, DEFAULT_RSSI_HYSTERESIS),
+        conf.get(CONF_RSSI_INTERVAL, DEFAULT_RSSI_INTERVAL),
+    )
+
     async def send_notification(title, message):
         """Send a persistent notification to Home Assistant UI."""
         await hass.services.async_call(
@@ -26,26 +89,34 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
             {"title": title, "message": message, "notification_id": f"{DOMAIN}_notification"},
         )
 
+    # Opens short active discovery windows; the adapters' own scanning mode is left to Home Assistant
+    scheduler = async_get_scan_scheduler(hass)
+
     async def handle_scan_devices(call: ServiceCall):
         """Handle scanning for Bluetooth devices."""
         _LOGGER.info("🔍 Scanning for Bluetooth devices...")
 
         try:
-            devices = await discover_bluetooth_devices(hass)
+            scheduler.async_request_active(REASON_USER_SCAN)
+            devices, changed = await discover_bluetooth_changes(hass, passive_scanning=False)
 
-            # Detect if Passive Scanning is ON or OFF
-            passive_scanning = any(device.get("rssi") != -100 for device in devices)
-            if passive_scanning:
-                _LOGGER.info("🟢 Passive Scanning is ON.")
-            else:
-                _LOGGER.warning("⚠️ Passive Scanning is OFF. Using fallback scanning.")
+            _LOGGER.info(f"📶 Scanned in {scheduler.mode.value} mode.")
 
             if not devices:
                 _LOGGER.warning("⚠️ No Bluetooth devices found during scan.")
                 await send_notification("Bluetooth Scan", "No Bluetooth devices found.")
                 return
 
-            _LOGGER.info(f"✅ Found {len(devices)} Bluetooth devices.")
+            # Nothing appeared, changed or left since the last scan; the event and device_list are still current
+            if not changed:
+                _LOGGER.info(f"✅ Found {len(devices)} Bluetooth devices, unchanged since the last scan.")
+                await send_notification(
+                    "Bluetooth Scan Complete",
+                    f"Discovered {len(devices)} Bluetooth devices, unchanged since the last scan.",
+                )
+                return
+
+            _LOGGER.info(f"✅ Found {len(devices)} Bluetooth devices ({changed} changed).")
             for device in devices:
                 _LOGGER.info(f"📡 Discovered: {device}")
 
@@ -72,7 +143,11 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
             await send_notification("Bluetooth Pairing Failed", "No MAC address provided.")
             return
         
-        success = pair_device(mac_address)
+        speaker = async_get_registry(hass).entity_for(mac_address)
+        if speaker is not None:
+            success = await speaker.async_pair()
+        else:
+            success = pair_device(mac_address)
         status = f"✅ Paired with {mac_address}" if success else f"❌ Pairing failed for {mac_address}"
         _LOGGER.info(status)
         await send_notification("Bluetooth Pairing", status)
@@ -88,7 +163,12 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
             await send_notification("Bluetooth Connection Failed", "No MAC address provided.")
             return
         
-        success = connect_device(mac_address)
+        speaker = async_get_registry(hass).entity_for(mac_address)
+        if speaker is not None:
+            await speaker.async_turn_on()
+            success = speaker.state == STATE_CONNECTED
+        else:
+            success = connect_device(mac_address)
         status = f"✅ Connected to {mac_address}" if success else f"❌ Connection failed for {mac_address}"
         _LOGGER.info(status)
         await send_notification("Bluetooth Connection", status)
@@ -104,7 +184,12 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
             await send_notification("Bluetooth Disconnection Failed", "No MAC address provided.")
             return
         
-        success = disconnect_device(mac_address)
+        speaker = async_get_registry(hass).entity_for(mac_address)
+        if speaker is not None:
+            await speaker.async_turn_off()
+            success = speaker.state == STATE_DISCONNECTED
+        else:
+            success = disconnect_device(mac_address)
         status = f"✅ Disconnected from {mac_address}" if success else f"❌ Disconnection failed for {mac_address}"
         _LOGGER.info(status)
         await send_notification("Bluetooth Disconnection", status)
@@ -112,11 +197,141 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         hass.bus.async_fire("bluetooth_speaker_disconnected", {"mac_address": mac_address, "status": success})
         hass.states.async_set(f"{DOMAIN}.disconnect_status", truncate_state(status))
 
+    recorder = AdvertisementRecorder(hass)
+
+    def capture_path(filename):
+        """Resolve a capture file name against the media folder."""
+        media_dir = next(iter(hass.config.media_dirs.values()), None) or hass.config.path("media")
+        return os.path.join(media_dir, filename)
+
+    async def reject_capture_path(path, title):
+        """Report a capture path outside Home Assistant's allowed directories."""
+        _LOGGER.error(f"❌ Capture path {path} is not in an allowed directory")
+        await send_notification(title, f"Capture path {path} is not in an allowed directory (see allowlist_external_dirs).")
+
+    async def handle_record_advertisements(call: ServiceCall):
+        """Record live advertisements to a capture file for offline replay."""
+        if recorder.is_recording:
+            _LOGGER.warning("⚠️ Advertisement recording already in progress")
+            return
+
+        duration = call.data.get("duration", DEFAULT_RECORD_DURATION)
+        path = capture_path(call.data.get("filename", DEFAULT_CAPTURE_FILE))
+        if not hass.config.is_allowed_path(path):
+            await reject_capture_path(path, "Bluetooth Recording Error")
+            return
+
+        # Start before creating the task so a second call made meanwhile sees the recording
+        recorder.async_start()
+
+        async def record():
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                records = recorder.async_stop()
+            await hass.async_add_executor_job(save_capture, path, records)
+            _LOGGER.info(f"💾 Saved {len(records)} advertisements to {path}")
+            await send_notification(
+                "Bluetooth Recording Complete",
+                f"Saved {len(records)} advertisements to {path} ({recorder.dropped} dropped).",
+            )
+
+        hass.async_create_task(record())
+
+    async def handle_replay_advertisements(call: ServiceCall):
+        """Replay a capture through the discovery pipeline and report throughput."""
+        if DATA_REPLAY_SESSION in hass.data:
+            _LOGGER.warning("⚠️ Advertisement replay already in progress")
+            return
+
+        path = capture_path(call.data.get("filename", DEFAULT_CAPTURE_FILE))
+        if not hass.config.is_allowed_path(path):
+            await reject_capture_path(path, "Bluetooth Replay Error")
+            return
+
+        speed = call.data.get("speed", DEFAULT_REPLAY_SPEED)
+        discover_interval = call.data.get("discover_interval", DEFAULT_REPLAY_DISCOVER_INTERVAL)
+        dispatch_to_entities = call.data.get("dispatch_to_entities", False)
+
+        # Claim the replay slot before the first await so a second call made meanwhile is refused
+        live_filter = async_get_advertisement_filter(hass)
+        session = hass.data[DATA_REPLAY_SESSION] = ReplaySession(
+            AdvertisementFilter(
+                call.data.get(CONF_RSSI_THRESHOLD, live_filter.rssi_threshold),
+                call.data.get(CONF_RSSI_INTERVAL, live_filter.rssi_interval),
+            )
+        )
+
+        try:
+            records = await hass.async_add_executor_job(load_capture, path)
+        except (OSError, ValueError) as e:
+            hass.data.pop(DATA_REPLAY_SESSION, None)
+            _LOGGER.error(f"🔥 Could not load capture {path}: {e}")
+            await send_notification("Bluetooth Replay Error", f"Could not load capture {path}: {e}")
+            return
+
+        # Replayed adverts only reach the entities, never the speakers' last-seen times or warm-up
+        registry = async_get_registry(hass)
+        dispatch_filter = AdvertisementFilter(session.filter.rssi_threshold, session.filter.rssi_interval)
+        discovery_times = []
+
+        def on_advertisement(service_info):
+            """Hand one replayed advert to the session's device table and, if asked, to the speaker entities."""
+            session.on_advertisement(service_info)
+            if dispatch_to_entities:
+                registry.async_dispatch_advertisement(service_info, dispatch_filter)
+
+        async def discover_during_replay():
+            """Keep discovery running against the replay so its cost lands in the loop lag figures."""
+            while True:
+                await asyncio.sleep(discover_interval)
+                started = time.perf_counter()
+                await discover_bluetooth_devices(hass, replay=session)
+                discovery_times.append(time.perf_counter() - started)
+
+        async def replay():
+            discovery_task = hass.async_create_task(discover_during_replay()) if discover_interval else None
+            try:
+                _LOGGER.info(f"⏯️ Replaying {len(records)} advertisements from {path} (speed {speed})")
+                stats = await AdvertisementReplay(records, speed).async_run(on_advertisement)
+                if discovery_task is not None:
+                    discovery_task.cancel()
+                stats["discovery_passes"] = len(discovery_times)
+                if discovery_times:
+                    stats["discovery_ms_mean"] = round(sum(discovery_times) / len(discovery_times) * 1000, 3)
+                    stats["discovery_ms_max"] = round(max(discovery_times) * 1000, 3)
+
+                # Time one final discovery pass against the complete replayed device table
+                started = time.perf_counter()
+                devices = await discover_bluetooth_devices(hass, replay=session)
+                stats["discovery_ms"] = round((time.perf_counter() - started) * 1000, 3)
+                stats["devices"] = len(devices)
+                stats["changed"] = session.filter.passed
+                stats["unchanged_dropped"] = session.filter.dropped
+                stats["lost"] = session.lost
+            finally:
+                if discovery_task is not None:
+                    discovery_task.cancel()
+                hass.data.pop(DATA_REPLAY_SESSION, None)
+
+            _LOGGER.info(f"✅ Replay complete: {stats}")
+            hass.bus.async_fire(EVENT_REPLAY_COMPLETED, stats)
+            hass.states.async_set(f"{DOMAIN}.replay_stats", truncate_state(stats["adverts_per_second"]), stats)
+            await send_notification(
+                "Bluetooth Replay Complete",
+                f"Processed {stats['processed']} advertisements at {stats['adverts_per_second']}/s, "
+                f"loop lag max {stats['loop_lag_max_ms']} ms.",
+            )
+
+        hass.async_create_task(replay())
+
     # Register services
     hass.services.async_register(DOMAIN, "pair_speaker", handle_pair_speaker)
     hass.services.async_register(DOMAIN, "connect_speaker", handle_connect_speaker)
     hass.services.async_register(DOMAIN, "disconnect_speaker", handle_disconnect_speaker)
     hass.services.async_register(DOMAIN, "scan_devices", handle_scan_devices)
+    hass.services.async_register(DOMAIN, "record_advertisements", handle_record_advertisements)
+    hass.services.async_register(DOMAIN, "replay_advertisements", handle_replay_advertisements)
 
     # Automatically scan on startup
     async def startup_scan(event):
@@ -126,6 +341,26 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
     hass.bus.async_listen_once(EVENT_HOMEASSISTANT_START, startup_scan)
 
+    # Periodically forget devices that stopped advertising so the device table stays bounded,
+    # and flag active scanning as wanted for configured speakers that have gone quiet
+    @callback
+    def expire_stale_devices(now):
+        """Evict devices not seen recently and look for missing speakers."""
+        async_expire_devices(hass)
+        registry = async_get_registry(hass)
+        registry.async_release_missing(DEFAULT_DEVICE_STALE_AFTER)
+        scheduler.async_check_missing_speakers(registry, registry.last_seen)
+
+    cancel_expiry = async_track_time_interval(hass, expire_stale_devices, timedelta(seconds=DEFAULT_EXPIRY_INTERVAL))
+
+    @callback
+    def shutdown(event):
+        """Stop the sweep and close any active scan window when Home Assistant stops."""
+        cancel_expiry()
+        scheduler.async_shutdown()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, shutdown)
+
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry):
@@ -133,10 +368,32 @@ async def async_setup_entry(hass: HomeAssistant, entry):
     _LOGGER.info("🔵 Setting up Bluetooth Speaker Control from entry")
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = entry.data
+
+    # Configured speakers are never evicted from the device table
+    mac_address = normalize_mac(entry.data.get(CONF_MAC_ADDRESS))
+    if mac_address:
+        async_get_device_store(hass).pin(mac_address)
+
+    async_get_registry(hass).async_add_entry(entry)
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Reload so the entity picks up a changed keep-warm option
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
+async def async_reload_entry(hass: HomeAssistant, entry):
+    """Reload a config entry after its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry):
     """Unload a config entry."""
     _LOGGER.info("🔵 Unloading Bluetooth Speaker Control entry")
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
     hass.data[DOMAIN].pop(entry.entry_id)
+    async_get_registry(hass).async_remove_entry(entry)
+
+    mac_address = normalize_mac(entry.data.get(CONF_MAC_ADDRESS))
+    if mac_address:
+        async_get_device_store(hass).unpin(mac_address)
     return True
@@ -0,0 +1,71 @@
+"""Per-device change detection for Bluetooth advertisements."""
+import logging
+import time
+
+from .const import DEFAULT_RSSI_HYSTERESIS, DEFAULT_RSSI_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def advertisement_fingerprint(service_info):
+    """Return a hashable fingerprint of the advertised payload, ignoring RSSI."""
+    manufacturer_data = service_info.manufacturer_data or {}
+    service_data = service_info.service_data or {}
+    return (
+        service_info.name,
+        tuple(sorted((key, bytes(value)) for key, value in manufacturer_data.items())),
+        tuple(sorted((key, bytes(value)) for key, value in service_data.items())),
+        tuple(sorted(service_info.service_uuids or [])),
+    )
+
+
+class AdvertisementFilter:
+    """Drop advertisements that repeat the last emitted payload for a device.
+
+    RSSI alone only counts as a change once it moves by rssi_threshold dB, or
+    once rssi_interval seconds have passed since the device was last emitted.
+    """
+
+    def __init__(self, rssi_threshold=DEFAULT_RSSI_HYSTERESIS, rssi_interval=DEFAULT_RSSI_INTERVAL):
+        """Initialize the filter."""
+        self.rssi_threshold = rssi_threshold
+        self.rssi_interval = rssi_interval
+        self.passed = 0
+        self.dropped = 0
+        self._last = {}  # address -> (fingerprint, rssi, emitted_at)
+
+    def should_emit(self, service_info, now=None):
+        """Return True if this advertisement carries a change worth propagating."""
+        if now is None:
+            now = time.monotonic()
+        address = service_info.address
+        fingerprint = advertisement_fingerprint(service_info)
+        rssi = service_info.rssi
+        last = self._last.get(address)
+
+        if last is not None:
+            last_fingerprint, last_rssi, emitted_at = last
+            if fingerprint == last_fingerprint and (
+                rssi == last_rssi
+                or (
+                    abs(rssi - last_rssi) < self.rssi_threshold
+                    and now - emitted_at < self.rssi_interval
+                )
+            ):
+                self.dropped += 1
+                return False
+
+        self._last[address] = (fingerprint, rssi, now)
+        self.passed += 1
+        return True
+
+    def forget(self, address):
+        """Drop the remembered state of a device so its next advert is emitted."""
+        self._last.pop(address, None)
+
+    def clear(self):
+        """Forget every device."""
+        self._last.clear()
+
+    def __len__(self):
+        return len(self._last)
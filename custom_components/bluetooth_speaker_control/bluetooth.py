@@ -9,10 +9,24 @@ from homeassistant.helpers.typing import ConfigType
 from homeassistant.components.bluetooth import (
     async_register_callback,
     async_discovered_service_info,
+    async_last_service_info,
     BluetoothScanningMode,
     BluetoothChange,
 )
 
+from .advertisement_filter import AdvertisementFilter
+from .device_store import DeviceStore
+from .scan_scheduler import async_get_scan_scheduler
+from .const import (
+    DATA_ADVERTISEMENT_FILTER,
+    DATA_DEVICE_STORE,
+    DATA_RSSI_SETTINGS,
+    DEFAULT_ACTIVE_SETTLE_TIME,
+    DEFAULT_RSSI_HYSTERESIS,
+    DEFAULT_RSSI_INTERVAL,
+    EVENT_DEVICE_LOST,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 BLUETOOTH_NUMBERS_DB = "https://raw.githubusercontent.com/NordicSemiconductor/bluetooth-numbers-database/refs/heads/master/"
@@ -24,13 +38,75 @@ CHARACTERISTIC_UUIDS = {}
 #from_scan(cls, device: BLEDevice, advertisement_data: AdvertisementData, rssi: int, connectable: bool, source: str)
 #from_advertisement(cls, address: str, advertisement_data: AdvertisementData, source: str)
 
-async def discover_bluetooth_devices(hass, timeout=30, passive_scanning=True):
+async def discover_bluetooth_devices(hass, timeout=30, passive_scanning=None, replay=None):
     """Discover Bluetooth devices using Home Assistant's built-in discovery API."""
+    discovered_devices, _changed = await discover_bluetooth_changes(hass, timeout, passive_scanning, replay)
+    return discovered_devices
+
+
+async def discover_bluetooth_changes(hass, timeout=30, passive_scanning=None, replay=None):
+    """Discover Bluetooth devices and count how many appeared, changed or were lost since the last pass.
+
+    passive_scanning=False opens an active window, True forces a passive pass
+    and None follows the scan scheduler. replay, if given, is a ReplaySession
+    to discover from instead of the radio; only the replay service passes one.
+    """
+
+    # A replay runs the same per-device work against its own filter and device table
+    if replay is not None:
+        discovered_devices, lost, changed = _process_service_infos(
+            replay.service_infos(), replay.filter, replay.device_store
+        )
+        changed += len(replay.async_expire(lost))
+        _LOGGER.debug(f"⏯️ Found {len(discovered_devices)} devices in replayed capture ({changed} changed)")
+        return discovered_devices, changed
+
+    scheduler = async_get_scan_scheduler(hass)
+    if passive_scanning is False and not scheduler.is_active:
+        scheduler.async_request_active("discovery")
+    active = scheduler.is_active and passive_scanning is not True
+    _LOGGER.debug(f"🔍 Discovering Bluetooth devices (Passive: {not active})...")
 
-    _LOGGER.debug(f"🔍 Discovering Bluetooth devices (Passive: {passive_scanning})...")
+    if active:
+        # Give connectable devices time to answer scan requests, then list only those
+        settle = min(timeout, DEFAULT_ACTIVE_SETTLE_TIME - scheduler.active_for)
+        if settle > 0:
+            await asyncio.sleep(settle)
+        service_infos = async_discovered_service_info(hass, connectable=True)
+    else:
+        service_infos = async_discovered_service_info(hass)
+
+    discovered_devices, lost, changed = _process_service_infos(
+        service_infos, async_get_advertisement_filter(hass), async_get_device_store(hass)
+    )
+    changed += len(async_expire_devices(hass, lost))
+
+    if discovered_devices and _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug(f"✅ Found {len(discovered_devices)} devices ({changed} changed): {json.dumps(discovered_devices, indent=2)}")
+
+    return discovered_devices, changed
+
+
+def _process_service_infos(service_infos, adv_filter, device_store):
+    """Format each discovered device, reusing the stored one when its advert has not changed.
+
+    Returns the formatted devices, the addresses evicted from device_store to
+    stay within capacity and how many devices were new or changed.
+    """
     discovered_devices = []
+    lost = []
+    changed = 0
+
+    for service_info in service_infos:
+        seen_at = getattr(service_info, "time", None)
+
+        # Unchanged adverts reuse the last formatted device and skip the expensive introspection below
+        cached_device = device_store.get(service_info.address)
+        if not adv_filter.should_emit(service_info, now=seen_at) and cached_device is not None:
+            lost.extend(device_store.touch(service_info.address, cached_device, seen_at))
+            discovered_devices.append(cached_device)
+            continue
 
-    for service_info in async_discovered_service_info(hass):
         _LOGGER.debug(f"📡 Service Info: {json.dumps(serialize_service_info(service_info), indent=2)}")
 
         _LOGGER.debug(f"🔍 from_advertisement(): {service_info.from_advertisement}")
@@ -104,13 +180,59 @@ async def discover_bluetooth_devices(hass, timeout=30, passive_scanning=True):
         except Exception as e:
             _LOGGER.error(f"⚠️ Error calling from_advertisement/from_scan: {e}")
  
-        discovered_devices.append(_format_device(service_info))
+        device = _format_device(service_info)
+        lost.extend(device_store.touch(service_info.address, device, seen_at))
+        discovered_devices.append(device)
+        changed += 1
 
-    if discovered_devices:
-        _LOGGER.info(f"✅ Found {len(discovered_devices)} devices before scanning: {json.dumps(discovered_devices, indent=2)}")
-        return discovered_devices
+    return discovered_devices, lost, changed
+
+
+def async_get_advertisement_filter(hass):
+    """Return the shared per-device advertisement filter, creating it on first use."""
+    adv_filter = hass.data.get(DATA_ADVERTISEMENT_FILTER)
+    if adv_filter is None:
+        adv_filter = hass.data[DATA_ADVERTISEMENT_FILTER] = async_create_live_filter(hass)
+    return adv_filter
+
+
+def async_create_live_filter(hass):
+    """Return a new advertisement filter using the configured RSSI hysteresis for live traffic."""
+    rssi_threshold, rssi_interval = hass.data.get(
+        DATA_RSSI_SETTINGS, (DEFAULT_RSSI_HYSTERESIS, DEFAULT_RSSI_INTERVAL)
+    )
+    return AdvertisementFilter(rssi_threshold, rssi_interval)
+
+
+def async_get_device_store(hass):
+    """Return the shared bounded device table, creating it on first use."""
+    device_store = hass.data.get(DATA_DEVICE_STORE)
+    if device_store is None:
+        device_store = hass.data[DATA_DEVICE_STORE] = DeviceStore()
+    return device_store
 
-    return discovered_devices
+
+def _last_advertised(hass, address):
+    """Return when Home Assistant last received an advertisement from an address, or None."""
+    service_info = async_last_service_info(hass, address, connectable=False)
+    return service_info.time if service_info is not None else None
+
+
+def async_expire_devices(hass, lost=()):
+    """Evict stale devices and fire a single device-lost event for everything that left."""
+    # Discovery only touches the table on scans, so check the advertisement stream before declaring a device lost
+    expired = async_get_device_store(hass).expire(refresh=lambda address: _last_advertised(hass, address))
+    lost = list(lost) + expired
+    if not lost:
+        return lost
+
+    adv_filter = async_get_advertisement_filter(hass)
+    for address in lost:
+        adv_filter.forget(address)
+
+    _LOGGER.debug(f"👋 Lost {len(lost)} Bluetooth devices: {lost}")
+    hass.bus.async_fire(EVENT_DEVICE_LOST, {"addresses": lost})
+    return lost
 
 
 async def fetch_bluetooth_database():
@@ -163,6 +285,11 @@ def extract_friendly_name(service_info):
     return None
 
 
+def get_manufacturer_name(manufacturer_id):
+    """Retrieve a company name from the Bluetooth SIG company database, or None."""
+    return BLUETOOTH_SIG_COMPANIES.get(str(manufacturer_id))
+
+
 def get_device_type(appearance_id):
     """Retrieve device type from GAP Appearance database."""
     return GAP_APPEARANCE.get(str(appearance_id), "Unknown Type")
@@ -338,10 +465,10 @@ def pair_device(mac_address):
         _LOGGER.error(f"Error pairing with {mac_address}: {e}")
         return False
 
-def connect_device(mac_address):
-    """Simulate connecting to a Bluetooth device."""
+def connect_device(mac_address, ble_device=None):
+    """Simulate connecting to a Bluetooth device, using a cached BLEDevice handle when given."""
     try:
-        _LOGGER.debug(f"Simulated connecting to {mac_address}")
+        _LOGGER.debug(f"Simulated connecting to {mac_address} (cached handle: {ble_device is not None})")
         return True
     except Exception as e:
         _LOGGER.error(f"Error connecting to {mac_address}: {e}")
@@ -2,8 +2,17 @@ import logging
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
-from .const import DOMAIN, CONF_MAC_ADDRESS, CONF_NAME
+from .const import (
+    DOMAIN,
+    CONF_KEEP_WARM,
+    CONF_MAC_ADDRESS,
+    CONF_NAME,
+    KEEP_WARM_ALWAYS,
+    KEEP_WARM_LAST_USED,
+    KEEP_WARM_OFF,
+)
 from .bluetooth import discover_bluetooth_devices
+from .scan_scheduler import REASON_CONFIG_FLOW, async_get_scan_scheduler
 from homeassistant.helpers.entity_component import async_update_entity
 from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
 
@@ -18,14 +27,23 @@ class BluetoothSpeakerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.discovered_devices = []
         self.selected_device = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow for this handler."""
+        return BluetoothSpeakerOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         """Handle the first step of the configuration flow."""
         errors = {}
 
         _LOGGER.info("🔍 Starting Bluetooth device discovery (config_flow).")
         try: 
-            passive_mode = self.hass.data.get("bluetooth_speaker_control_passive", False)
-            self.discovered_devices = await discover_bluetooth_devices(self.hass, timeout=7, passive_scanning=passive_mode)
+            # Open an active window while the device list is shown; on submit, discovery follows the
+            # still-open window so the selected device is looked up in the same connectable list
+            if user_input is None:
+                async_get_scan_scheduler(self.hass).async_request_active(REASON_CONFIG_FLOW)
+            self.discovered_devices = await discover_bluetooth_devices(self.hass, timeout=7)
 
             _LOGGER.info(f"✅ Discovered devices: {self.discovered_devices}")
         except Exception as e:
@@ -108,3 +126,34 @@ class BluetoothSpeakerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         }
 
         return vol.Schema({vol.Required(CONF_MAC_ADDRESS): vol.In(device_options)})
+
+
+class BluetoothSpeakerOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for a configured Bluetooth speaker."""
+
+    def __init__(self, config_entry):
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Choose whether the link to this speaker is kept warm."""
+        if user_input is not None:
+            _LOGGER.info(f"✅ Saving options for {self._entry.title}: {user_input}")
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_KEEP_WARM,
+                        default=self._entry.options.get(CONF_KEEP_WARM, KEEP_WARM_OFF),
+                    ): vol.In(
+                        {
+                            KEEP_WARM_OFF: "Connect on demand",
+                            KEEP_WARM_LAST_USED: "Keep the link warm if this was the last used speaker",
+                            KEEP_WARM_ALWAYS: "Keep the link warm whenever the speaker is in range",
+                        }
+                    )
+                }
+            ),
+        )
@@ -6,6 +6,14 @@ DEFAULT_NAME = "Bluetooth Speaker Control"
 # Configuration Keys
 CONF_MAC_ADDRESS = "mac_address"
 CONF_NAME = "name"
+CONF_KEEP_WARM = "keep_warm"
+CONF_RSSI_THRESHOLD = "rssi_threshold"
+CONF_RSSI_INTERVAL = "rssi_interval"
+
+# Keep Warm Modes
+KEEP_WARM_OFF = "off"  # Connect on demand only
+KEEP_WARM_LAST_USED = "last_used"  # Hold the link for the most recently used speaker
+KEEP_WARM_ALWAYS = "always"  # Hold the link whenever the speaker is in range
 
 # Home Assistant Events
 EVENT_BLUETOOTH_DEVICE_DISCOVERED = "bluetooth_device_discovered"
@@ -13,6 +21,8 @@ EVENT_BLUETOOTH_DEVICE_CONNECTED = "bluetooth_device_connected"
 EVENT_BLUETOOTH_DEVICE_DISCONNECTED = "bluetooth_device_disconnected"
 EVENT_BLUETOOTH_SCAN_STARTED = "bluetooth_scan_started"
 EVENT_BLUETOOTH_SCAN_COMPLETED = "bluetooth_scan_completed"
+EVENT_DEVICE_LOST = "bluetooth_speaker_control_device_lost"
+EVENT_REPLAY_COMPLETED = "bluetooth_speaker_control_replay_completed"
 
 # Device States
 STATE_CONNECTED = "connected"
@@ -32,6 +42,41 @@ DEFAULT_RECONNECT_INTERVAL = 15  # Seconds before attempting to reconnect
 DEFAULT_MAX_SCAN_ATTEMPTS = 5  # Number of times to retry scanning before failing
 DEFAULT_CONNECTION_TIMEOUT = 30  # Timeout for connections (in seconds)
 
+# Advertisement Change Detection
+DATA_ADVERTISEMENT_FILTER = "bluetooth_speaker_control_advertisement_filter"
+DATA_RSSI_SETTINGS = "bluetooth_speaker_control_rssi_settings"  # (rssi_threshold, rssi_interval) for live filters
+DEFAULT_RSSI_HYSTERESIS = 5  # dB an RSSI must move before it counts as a change
+DEFAULT_RSSI_INTERVAL = 30  # Seconds after which any RSSI change is let through
+
+# Keep Warm
+DEFAULT_WARM_UP_RETRY_COOLDOWN = 60  # Seconds before retrying a failed pre-connect
+
+# Speaker Registry
+DATA_SPEAKER_REGISTRY = "bluetooth_speaker_control_registry"
+PLATFORMS = ["media_player"]
+
+# Scan Scheduling
+DATA_SCAN_SCHEDULER = "bluetooth_speaker_control_scan_scheduler"
+DATA_PASSIVE_SCANNING = "bluetooth_speaker_control_passive"  # False while an active discovery window is open
+DEFAULT_ACTIVE_BURST_DURATION = 10  # Seconds an active discovery window stays open
+DEFAULT_ACTIVE_SETTLE_TIME = 2  # Seconds discovery waits for scan responses after a window opens
+DEFAULT_MISSING_SPEAKER_COOLDOWN = 300  # Seconds between active scan requests for the same missing speaker
+
+# Device Table
+DATA_DEVICE_STORE = "bluetooth_speaker_control_device_store"
+DEFAULT_MAX_DEVICES = 1000  # Devices kept before the least recently seen is evicted
+DEFAULT_DEVICE_STALE_AFTER = 300  # Seconds without an advert before a device is considered lost
+DEFAULT_EXPIRY_INTERVAL = 60  # Seconds between stale device sweeps
+
+# Advertisement Capture & Replay
+DATA_REPLAY_SESSION = "bluetooth_speaker_control_replay"  # hass.data key for the running ReplaySession
+DEFAULT_CAPTURE_FILE = "bluetooth_speaker_control_capture.jsonl"
+DEFAULT_RECORD_DURATION = 60  # Seconds to record advertisements for
+DEFAULT_MAX_RECORDS = 100000  # Upper bound on adverts held in memory while recording
+DEFAULT_REPLAY_SPEED = 1.0  # 1.0 = real time, 0 = as fast as possible
+DEFAULT_REPLAY_DISCOVER_INTERVAL = 1.0  # Seconds between discovery passes while replaying, 0 = none
+LOOP_LAG_SAMPLE_INTERVAL = 0.05  # Seconds between event loop lag samples during replay
+
 # Services
 SERVICE_PAIR_SPEAKER = "pair_speaker"
 SERVICE_CONNECT_SPEAKER = "connect_speaker"
@@ -39,3 +84,5 @@ SERVICE_DISCONNECT_SPEAKER = "disconnect_speaker"
 SERVICE_SCAN_DEVICES = "scan_devices"
 SERVICE_RECONNECT_SPEAKER = "reconnect_speaker"
 SERVICE_RESET_BLUETOOTH = "reset_bluetooth"
+SERVICE_RECORD_ADVERTISEMENTS = "record_advertisements"
+SERVICE_REPLAY_ADVERTISEMENTS = "replay_advertisements"
@@ -0,0 +1,121 @@
+"""Capacity-bounded table of discovered devices with heap-based stale expiry."""
+import heapq
+import logging
+import time
+
+from .const import DEFAULT_DEVICE_STALE_AFTER, DEFAULT_MAX_DEVICES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DeviceStore:
+    """Hold the latest formatted device per address and forget devices that go quiet.
+
+    The heap keeps at most one live entry per unpinned device. Touching a device
+    only updates its last-seen time; the heap entry is refreshed lazily when it
+    reaches the top, so both touches and evictions stay O(log n) or better.
+    Pinned addresses (configured speakers) are never evicted.
+    """
+
+    def __init__(self, capacity=DEFAULT_MAX_DEVICES, stale_after=DEFAULT_DEVICE_STALE_AFTER):
+        """Initialize the store."""
+        self.capacity = capacity
+        self.stale_after = stale_after
+        self._devices = {}  # address -> device
+        self._last_seen = {}  # address -> monotonic timestamp
+        self._heap = []  # (last_seen when pushed, address)
+        self._queued = set()  # addresses with an entry in the heap
+        self._pinned = set()
+
+    def __len__(self):
+        return len(self._devices)
+
+    def __contains__(self, address):
+        return address in self._devices
+
+    def get(self, address):
+        """Return the stored device for an address, or None."""
+        return self._devices.get(address)
+
+    def last_seen(self, address):
+        """Return when an address was last seen, or None."""
+        return self._last_seen.get(address)
+
+    def touch(self, address, device, now=None):
+        """Store a device and mark it seen. Returns addresses evicted to stay within capacity."""
+        if now is None:
+            now = time.monotonic()
+        self._devices[address] = device
+        self._last_seen[address] = max(now, self._last_seen.get(address, now))
+        if address not in self._pinned:
+            self._push(address)
+
+        lost = []
+        while len(self._devices) > self.capacity:
+            evicted = self._pop_oldest()
+            if evicted is None:
+                break
+            lost.append(evicted)
+        return lost
+
+    def pin(self, address):
+        """Never evict this address."""
+        self._pinned.add(address)
+
+    def unpin(self, address):
+        """Allow this address to be evicted again."""
+        if address not in self._pinned:
+            return
+        self._pinned.discard(address)
+        if address in self._devices:
+            self._push(address)
+
+    def expire(self, now=None, refresh=None):
+        """Evict every unpinned device not seen for stale_after seconds and return their addresses.
+
+        refresh, if given, returns a newer last-seen timestamp for an address (or
+        None) and is only consulted for devices that look stale, so devices that
+        kept advertising between touches are not reported lost.
+        """
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self.stale_after
+        lost = []
+        while True:
+            evicted = self._pop_oldest(cutoff, refresh)
+            if evicted is None:
+                return lost
+            lost.append(evicted)
+
+    def remove(self, address):
+        """Forget a device immediately; its heap entry is discarded lazily."""
+        self._devices.pop(address, None)
+        self._last_seen.pop(address, None)
+
+    def _push(self, address):
+        """Queue an address unless it already has a heap entry."""
+        if address not in self._queued:
+            self._queued.add(address)
+            heapq.heappush(self._heap, (self._last_seen[address], address))
+
+    def _pop_oldest(self, cutoff=None, refresh=None):
+        """Evict the least recently seen unpinned device, optionally only if seen at or before cutoff."""
+        while self._heap:
+            if cutoff is not None and self._heap[0][0] > cutoff:
+                return None
+            pushed_at, address = heapq.heappop(self._heap)
+            self._queued.discard(address)
+            if address not in self._devices or address in self._pinned:
+                continue
+            last_seen = self._last_seen[address]
+            if refresh is not None and last_seen <= pushed_at:
+                fresh = refresh(address)
+                if fresh is not None and fresh > last_seen:
+                    last_seen = self._last_seen[address] = fresh
+            if last_seen > pushed_at:
+                # Seen since this entry was pushed; requeue with the real timestamp
+                self._push(address)
+                continue
+            self.remove(address)
+            return address
+        return None
@@ -1,31 +1,160 @@
 import logging
+import time
+from homeassistant.components.bluetooth import async_ble_device_from_address
 from homeassistant.components.media_player import (
     MediaPlayerEntity,
     MediaPlayerEntityFeature,
 )
+from homeassistant.core import callback
 from homeassistant.const import STATE_IDLE, STATE_PLAYING, STATE_OFF
-from .const import DOMAIN, STATE_CONNECTED, STATE_DISCONNECTED, STATE_PAIRING, STATE_FAILED
+from .const import (
+    DOMAIN,
+    CONF_KEEP_WARM,
+    DEFAULT_WARM_UP_RETRY_COOLDOWN,
+    KEEP_WARM_ALWAYS,
+    KEEP_WARM_LAST_USED,
+    KEEP_WARM_OFF,
+    STATE_CONNECTED,
+    STATE_DISCONNECTED,
+    STATE_PAIRING,
+    STATE_FAILED,
+)
 from .bluetooth import pair_device, connect_device, disconnect_device
+from .registry import async_get_registry, normalize_mac
 
 _LOGGER = logging.getLogger(__name__)
 
+# How a connection was started, reported in the entity's attributes
+CONNECT_SOURCE_WARM = "warm"  # Link was already held
+CONNECT_SOURCE_CACHED = "cached"  # BLEDevice cached from the advertisement stream
+CONNECT_SOURCE_LOOKUP = "lookup"  # BLEDevice looked up at connect time
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the Bluetooth Speaker entity from a config entry."""
     mac_address = entry.data.get("mac_address")
     speaker_name = entry.data.get("name", "Bluetooth Speaker")
-    async_add_entities([BluetoothSpeaker(speaker_name, mac_address)])
+    keep_warm = entry.options.get(CONF_KEEP_WARM, KEEP_WARM_OFF)
+    async_add_entities([BluetoothSpeaker(speaker_name, mac_address, keep_warm)])
 
 
 class BluetoothSpeaker(MediaPlayerEntity):
     """Representation of a Bluetooth speaker."""
 
-    def __init__(self, name, speaker_mac):
+    def __init__(self, name, speaker_mac, keep_warm=KEEP_WARM_OFF):
         """Initialize the Bluetooth speaker."""
         self._name = name
         self._speaker_mac = speaker_mac
+        self._keep_warm = keep_warm
         self._state = STATE_DISCONNECTED
         self._volume_level = 0.5  # Default volume level
         self._is_muted = False
+        self._rssi = None
+        self._record = None
+        self._time_to_connected_ms = None
+        self._connect_source = None
+        self._warm_up_task = None
+        self._warm_up_failed_at = None
+
+    async def async_added_to_hass(self):
+        """Register this entity under its MAC address."""
+        self._record = async_get_registry(self.hass).async_attach_entity(self._speaker_mac, self)
+        if self.should_keep_warm and self._record is not None and self._record.ble_device is not None:
+            self.async_schedule_warm_up()
+
+    async def async_will_remove_from_hass(self):
+        """Release any held link and unregister this entity."""
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+        if self._record is not None and self._record.connection:
+            disconnect_device(self._speaker_mac)
+        async_get_registry(self.hass).async_detach_entity(self._speaker_mac, self)
+        self._record = None
+
+    @callback
+    def async_on_advertisement(self, service_info):
+        """Handle a changed advertisement from this speaker."""
+        self._rssi = service_info.rssi
+        self.async_write_ha_state()
+
+    def _set_connection(self, connection):
+        """Record the connection handle in the speaker registry."""
+        if self._record is not None:
+            self._record.connection = connection
+
+    @property
+    def should_keep_warm(self):
+        """Return True if the link to this speaker should be held while it is in range."""
+        if self._keep_warm == KEEP_WARM_ALWAYS:
+            return True
+        if self._keep_warm == KEEP_WARM_LAST_USED and self.hass is not None:
+            return async_get_registry(self.hass).last_used == normalize_mac(self._speaker_mac)
+        return False
+
+    @callback
+    def async_schedule_warm_up(self):
+        """Pre-connect in the background unless a warm-up is running or recently failed."""
+        if (
+            self._warm_up_failed_at is not None
+            and time.monotonic() - self._warm_up_failed_at < DEFAULT_WARM_UP_RETRY_COOLDOWN
+        ):
+            return
+        if self._warm_up_task is None or self._warm_up_task.done():
+            self._warm_up_task = self.hass.async_create_task(self._async_warm_up())
+
+    @callback
+    def async_release_warm_link(self, force=False):
+        """Drop an idle warm link that is no longer wanted, or always if force is set."""
+        if self._state != STATE_DISCONNECTED or self._record is None or not self._record.connection:
+            return
+        if self.should_keep_warm and not force:
+            return
+        _LOGGER.debug(f"❄️ Releasing warm link to {self._name} ({self._speaker_mac})")
+        disconnect_device(self._speaker_mac)
+        self._set_connection(None)
+        self.async_write_ha_state()
+
+    async def _async_warm_up(self):
+        """Open a link without turning the speaker on, so the next turn on is instant."""
+        if self._record is None or self._record.connection:
+            return
+        ble_device, _ = self._get_ble_device()
+        if ble_device is None:
+            self._warm_up_failed_at = time.monotonic()
+            return
+        _LOGGER.debug(f"♨️ Pre-connecting to {self._name} ({self._speaker_mac})")
+        connection = connect_device(self._speaker_mac, ble_device)
+        if connection:
+            self._warm_up_failed_at = None
+            self._set_connection(connection)
+            self.async_write_ha_state()
+        else:
+            self._warm_up_failed_at = time.monotonic()
+            _LOGGER.debug(f"⚠️ Pre-connect to {self._name} failed; retrying in {DEFAULT_WARM_UP_RETRY_COOLDOWN}s at the earliest")
+
+    def _get_ble_device(self):
+        """Return the cached BLEDevice, falling back to Home Assistant's lookup, and where it came from."""
+        if self._record is not None and self._record.ble_device is not None:
+            return self._record.ble_device, CONNECT_SOURCE_CACHED
+        ble_device = async_ble_device_from_address(self.hass, self._speaker_mac, connectable=True)
+        if self._record is not None:
+            self._record.ble_device = ble_device
+        return ble_device, CONNECT_SOURCE_LOOKUP
+
+    async def _async_connect(self):
+        """Connect using a warm link or cached handle and time how long it took."""
+        started = time.perf_counter()
+        if self._record is not None and self._record.connection:
+            connection, source = self._record.connection, CONNECT_SOURCE_WARM
+        else:
+            ble_device, source = self._get_ble_device()
+            connection = connect_device(self._speaker_mac, ble_device)
+
+        if connection:
+            self._time_to_connected_ms = round((time.perf_counter() - started) * 1000, 1)
+            self._connect_source = source
+            self._set_connection(connection)
+            async_get_registry(self.hass).async_set_last_used(self._speaker_mac)
+        return connection
 
     @property
     def name(self):
@@ -37,6 +166,18 @@ class BluetoothSpeaker(MediaPlayerEntity):
         """Return the current state of the speaker."""
         return self._state
 
+    @property
+    def extra_state_attributes(self):
+        """Return the speaker's address, signal strength and connection timing."""
+        return {
+            "mac_address": self._speaker_mac,
+            "rssi": self._rssi,
+            "time_to_connected_ms": self._time_to_connected_ms,
+            "connect_source": self._connect_source,
+            "keep_warm": self._keep_warm,
+            "warm": bool(self._record and self._record.connection) and self._state == STATE_DISCONNECTED,
+        }
+
     @property
     def supported_features(self):
         """Return the features supported by this media player."""
@@ -53,9 +194,9 @@ class BluetoothSpeaker(MediaPlayerEntity):
     async def async_turn_on(self):
         """Connect to the speaker."""
         _LOGGER.info(f"🔄 Attempting to connect to {self._name} ({self._speaker_mac})")
-        if connect_device(self._speaker_mac):
+        if await self._async_connect():
             self._state = STATE_CONNECTED
-            _LOGGER.info(f"✅ Connected to {self._name}")
+            _LOGGER.info(f"✅ Connected to {self._name} in {self._time_to_connected_ms} ms ({self._connect_source})")
         else:
             self._state = STATE_FAILED
             _LOGGER.error(f"❌ Failed to connect to {self._name}")
@@ -64,13 +205,33 @@ class BluetoothSpeaker(MediaPlayerEntity):
     async def async_turn_off(self):
         """Disconnect from the speaker."""
         _LOGGER.info(f"🔄 Disconnecting from {self._name} ({self._speaker_mac})")
-        if disconnect_device(self._speaker_mac):
+        if self.should_keep_warm and self._record is not None and self._record.connection:
             self._state = STATE_DISCONNECTED
+            _LOGGER.info(f"♨️ Turned off {self._name}, keeping the link warm")
+        elif disconnect_device(self._speaker_mac):
+            self._state = STATE_DISCONNECTED
+            self._set_connection(None)
             _LOGGER.info(f"✅ Disconnected from {self._name}")
         else:
             _LOGGER.error(f"❌ Failed to disconnect from {self._name}")
         self.async_write_ha_state()
 
+    async def async_pair(self):
+        """Pair with the speaker."""
+        _LOGGER.info(f"🔄 Pairing with {self._name} ({self._speaker_mac})")
+        previous_state = self._state
+        self._state = STATE_PAIRING
+        self.async_write_ha_state()
+        if pair_device(self._speaker_mac):
+            # Pairing does not change the link, so a connected speaker stays connected
+            self._state = STATE_DISCONNECTED if previous_state in (STATE_PAIRING, STATE_FAILED) else previous_state
+            _LOGGER.info(f"✅ Paired with {self._name}")
+        else:
+            self._state = STATE_FAILED
+            _LOGGER.error(f"❌ Pairing failed for {self._name}")
+        self.async_write_ha_state()
+        return self._state != STATE_FAILED
+
     async def async_media_play(self):
         """Simulate playing media."""
         if self._state == STATE_CONNECTED:
@@ -107,9 +268,9 @@ class BluetoothSpeaker(MediaPlayerEntity):
     async def async_reconnect(self):
         """Reconnect to the last known speaker."""
         _LOGGER.info(f"🔄 Attempting to reconnect to {self._name} ({self._speaker_mac})")
-        if connect_device(self._speaker_mac):
+        if await self._async_connect():
             self._state = STATE_CONNECTED
-            _LOGGER.info(f"✅ Reconnected to {self._name}")
+            _LOGGER.info(f"✅ Reconnected to {self._name} in {self._time_to_connected_ms} ms ({self._connect_source})")
         else:
             self._state = STATE_FAILED
             _LOGGER.error(f"❌ Reconnection failed for {self._name}")
@@ -118,10 +279,14 @@ class BluetoothSpeaker(MediaPlayerEntity):
     async def async_reset_bluetooth(self):
         """Reset the Bluetooth adapter."""
         _LOGGER.info("🔄 Resetting Bluetooth adapter...")
-        success = disconnect_device(self._speaker_mac) and connect_device(self._speaker_mac)
+        success = disconnect_device(self._speaker_mac)
+        if success:
+            # The old link is gone; reconnect from scratch so the handle, timing and last used speaker are current
+            self._set_connection(None)
+            success = await self._async_connect()
         if success:
             self._state = STATE_CONNECTED
-            _LOGGER.info("✅ Bluetooth adapter reset successfully")
+            _LOGGER.info(f"✅ Bluetooth adapter reset successfully, reconnected in {self._time_to_connected_ms} ms")
         else:
             self._state = STATE_FAILED
             _LOGGER.error("❌ Failed to reset Bluetooth adapter")
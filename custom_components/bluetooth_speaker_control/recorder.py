@@ -0,0 +1,318 @@
+"""Record live Bluetooth advertisements and replay them offline for load testing."""
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.components.bluetooth import (
+    async_register_callback,
+    BluetoothScanningMode,
+)
+
+from .bluetooth import get_manufacturer_name, serialize_service_info
+from .device_store import DeviceStore
+from .const import DEFAULT_MAX_RECORDS, DEFAULT_REPLAY_SPEED, LOOP_LAG_SAMPLE_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RecordedServiceInfo:
+    """Lightweight stand-in for BluetoothServiceInfoBleak rebuilt from a capture.
+
+    Carries the attributes and constructors discovery reads from live service
+    info, so a replay runs the same per-device work as live traffic.
+    """
+
+    def __init__(self, record):
+        """Decode a captured record back into service info attributes."""
+        self.name = record.get("name")
+        self.address = record.get("address")
+        self.rssi = record.get("rssi", -100)
+        self.manufacturer_data = {
+            int(key): base64.b64decode(value) for key, value in (record.get("manufacturer_data") or {}).items()
+        }
+        self.service_data = {
+            key: base64.b64decode(value) for key, value in (record.get("service_data") or {}).items()
+        }
+        self.service_uuids = record.get("service_uuids") or []
+        self.source = record.get("source", "replay")
+        self.connectable = record.get("connectable", False)
+        tx_power = record.get("tx_power")
+        self.tx_power = tx_power if isinstance(tx_power, int) else None
+        self.time = record.get("t", 0.0)
+        self.advertisement = None
+        self.device = None
+
+    def __repr__(self):
+        return f"RecordedServiceInfo({self.address}, rssi={self.rssi}, t={self.time:.3f})"
+
+    @property
+    def manufacturer_id(self):
+        """Return the last advertised manufacturer ID, or None."""
+        return next(reversed(self.manufacturer_data), None) if self.manufacturer_data else None
+
+    @property
+    def manufacturer(self):
+        """Return the manufacturer name for manufacturer_id, or None."""
+        manufacturer_id = self.manufacturer_id
+        return get_manufacturer_name(manufacturer_id) if manufacturer_id is not None else None
+
+    def as_dict(self):
+        """Return the service info attributes as a dict."""
+        return {
+            "name": self.name,
+            "address": self.address,
+            "rssi": self.rssi,
+            "manufacturer_data": self.manufacturer_data,
+            "service_data": self.service_data,
+            "service_uuids": self.service_uuids,
+            "source": self.source,
+            "connectable": self.connectable,
+            "tx_power": self.tx_power,
+            "time": self.time,
+            "advertisement": self.advertisement,
+            "device": self.device,
+        }
+
+    @classmethod
+    def from_advertisement(cls, address, advertisement_data, source):
+        """Build service info from an address and advertisement data."""
+        service_info = cls({"address": address, "source": source})
+        return service_info._with_advertisement(advertisement_data)
+
+    @classmethod
+    def from_scan(cls, device, advertisement_data, rssi, connectable, source):
+        """Build service info from a scanned device and its advertisement data."""
+        service_info = cls({
+            "address": device.address,
+            "name": device.name,
+            "rssi": rssi,
+            "connectable": connectable,
+            "source": source,
+        })
+        service_info.device = device
+        return service_info._with_advertisement(advertisement_data)
+
+    @classmethod
+    def from_device_and_advertisement_data(cls, device, advertisement_data, source, time, connectable):
+        """Build service info from a device, its advertisement data and when it was received."""
+        service_info = cls.from_scan(
+            device, advertisement_data, getattr(advertisement_data, "rssi", -100), connectable, source
+        )
+        service_info.time = time
+        return service_info
+
+    def _with_advertisement(self, advertisement_data):
+        """Copy the payload of an AdvertisementData, if there is one."""
+        self.advertisement = advertisement_data
+        if advertisement_data is not None:
+            self.name = advertisement_data.local_name or self.name
+            self.rssi = advertisement_data.rssi
+            self.manufacturer_data = dict(advertisement_data.manufacturer_data)
+            self.service_data = dict(advertisement_data.service_data)
+            self.service_uuids = list(advertisement_data.service_uuids)
+            self.tx_power = advertisement_data.tx_power
+        return self
+
+
+class AdvertisementRecorder:
+    """Capture what async_register_callback delivers, with timestamps."""
+
+    def __init__(self, hass: HomeAssistant, max_records=DEFAULT_MAX_RECORDS):
+        """Initialize the recorder."""
+        self.hass = hass
+        self.max_records = max_records
+        self.records = []
+        self.dropped = 0
+        self._started = None
+        self._cancel = None
+
+    @property
+    def is_recording(self):
+        """Return True while the recorder is attached to the Bluetooth stack."""
+        return self._cancel is not None
+
+    @callback
+    def async_start(self):
+        """Start receiving advertisements from every adapter."""
+        if self._cancel:
+            return
+        self.records = []
+        self.dropped = 0
+        self._started = time.monotonic()
+        self._cancel = async_register_callback(
+            self.hass, self._async_on_advertisement, None, BluetoothScanningMode.PASSIVE
+        )
+        _LOGGER.info("⏺️ Recording Bluetooth advertisements...")
+
+    @callback
+    def async_stop(self):
+        """Stop recording and return the captured records."""
+        if self._cancel:
+            self._cancel()
+            self._cancel = None
+        _LOGGER.info(f"⏹️ Recorded {len(self.records)} advertisements ({self.dropped} dropped)")
+        return self.records
+
+    @callback
+    def _async_on_advertisement(self, service_info, change):
+        """Store one advertisement with its offset from the start of the capture."""
+        if len(self.records) >= self.max_records:
+            self.dropped += 1
+            return
+        record = serialize_service_info(service_info)
+        if not record:
+            return
+        record["t"] = round(time.monotonic() - self._started, 6)
+        record["change"] = getattr(change, "name", str(change))
+        self.records.append(record)
+
+
+def save_capture(path, records):
+    """Write captured records as JSON lines (runs in the executor)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as capture:
+        for record in records:
+            capture.write(json.dumps(record) + "\n")
+
+
+def load_capture(path):
+    """Read a JSON lines capture, ordered by timestamp (runs in the executor)."""
+    records = []
+    with open(path, encoding="utf-8") as capture:
+        for line in capture:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    records.sort(key=lambda record: record.get("t", 0.0))
+    return records
+
+
+class LoopLagMonitor:
+    """Sample how late the event loop wakes a sleeping task."""
+
+    def __init__(self, interval=LOOP_LAG_SAMPLE_INTERVAL):
+        """Initialize the monitor."""
+        self.interval = interval
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self._task = None
+
+    def start(self):
+        """Start sampling in a background task."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop sampling."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+
+    @property
+    def mean_lag(self):
+        """Return the mean lag in seconds."""
+        return self.total_lag / self.samples if self.samples else 0.0
+
+
+class ReplaySession:
+    """Device table, change filter and discovered-device table owned by one replay.
+
+    Kept apart from the live filter and device table so a replay never leaves
+    captured devices or RSSI state behind in production discovery, and never
+    fires production device-lost events.
+    """
+
+    def __init__(self, adv_filter, device_store=None):
+        """Initialize the session with the filter used to drop unchanged adverts."""
+        self.filter = adv_filter
+        self.device_store = device_store if device_store is not None else DeviceStore()
+        self.devices = {}  # address -> latest RecordedServiceInfo, like Home Assistant's discovered table
+        self.lost = 0
+        self.clock = 0.0  # capture time of the latest replayed advert
+
+    def on_advertisement(self, service_info):
+        """Keep the latest replayed advertisement per device."""
+        self.devices[service_info.address] = service_info
+        self.clock = max(self.clock, service_info.time)
+
+    def service_infos(self):
+        """Return the latest advertisement of every replayed device, for discovery."""
+        return list(self.devices.values())
+
+    def async_expire(self, lost=()):
+        """Evict devices that went quiet on the capture's clock and forget their filter state."""
+        expired = list(lost) + self.device_store.expire(now=self.clock, refresh=self._last_advertised)
+        for address in expired:
+            self.filter.forget(address)
+            self.devices.pop(address, None)
+        self.lost += len(expired)
+        return expired
+
+    def _last_advertised(self, address):
+        service_info = self.devices.get(address)
+        return service_info.time if service_info is not None else None
+
+
+class AdvertisementReplay:
+    """Feed a capture back into the discovery pipeline without a radio."""
+
+    def __init__(self, records, speed=DEFAULT_REPLAY_SPEED, yield_every=100):
+        """Initialize the replay.
+
+        speed 1.0 replays in real time, 10.0 ten times faster and 0 as fast as possible.
+        """
+        self.records = records
+        self.speed = speed
+        self.yield_every = yield_every
+
+    async def async_run(self, on_advertisement):
+        """Deliver each record to on_advertisement and return throughput and lag stats."""
+        loop = asyncio.get_running_loop()
+        monitor = LoopLagMonitor()
+        monitor.start()
+
+        processed = 0
+        started = loop.time()
+        first_offset = self.records[0].get("t", 0.0) if self.records else 0.0
+
+        try:
+            for record in self.records:
+                if self.speed > 0:
+                    delay = started + (record.get("t", 0.0) - first_offset) / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                elif processed % self.yield_every == 0:
+                    await asyncio.sleep(0)
+
+                on_advertisement(RecordedServiceInfo(record))
+                processed += 1
+        finally:
+            elapsed = loop.time() - started
+            await monitor.stop()
+
+        return {
+            "processed": processed,
+            "elapsed_s": round(elapsed, 3),
+            "adverts_per_second": round(processed / elapsed, 1) if elapsed > 0 else float(processed),
+            "loop_lag_mean_ms": round(monitor.mean_lag * 1000, 3),
+            "loop_lag_max_ms": round(monitor.max_lag * 1000, 3),
+            "speed": self.speed,
+        }
@@ -0,0 +1,181 @@
+"""MAC-indexed registry of configured speakers and their live entities."""
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.components.bluetooth import (
+    async_ble_device_from_address,
+    async_register_callback,
+    BluetoothScanningMode,
+)
+
+from .bluetooth import async_create_live_filter
+from .const import CONF_MAC_ADDRESS, DATA_SPEAKER_REGISTRY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def normalize_mac(address):
+    """Return a MAC address in the upper-case, colon-separated form Home Assistant uses."""
+    if not address:
+        return None
+    return address.strip().upper().replace("-", ":")
+
+
+class RegisteredSpeaker:
+    """A configured speaker: its config entry, entity, connection handle and latest BLEDevice."""
+
+    def __init__(self, mac_address, entry_id):
+        """Initialize the record."""
+        self.mac_address = mac_address
+        self.entry_id = entry_id
+        self.entity = None
+        self.connection = None
+        self.last_seen = None
+        self.ble_device = None
+
+    def __repr__(self):
+        return f"RegisteredSpeaker({self.mac_address}, entry={self.entry_id}, entity={self.entity is not None})"
+
+
+class SpeakerRegistry:
+    """Route services and advertisements to the speaker entity for a MAC in O(1)."""
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the registry."""
+        self.hass = hass
+        self._speakers = {}  # normalized MAC -> RegisteredSpeaker
+        self._filter = async_create_live_filter(hass)
+        self._cancel_callback = None
+        self.last_used = None  # MAC of the most recently connected speaker
+
+    def __len__(self):
+        return len(self._speakers)
+
+    def __contains__(self, address):
+        return normalize_mac(address) in self._speakers
+
+    def __iter__(self):
+        return iter(list(self._speakers))
+
+    def get(self, address):
+        """Return the record for a MAC address, or None."""
+        return self._speakers.get(normalize_mac(address))
+
+    def last_seen(self, address):
+        """Return when a configured speaker last advertised, or None."""
+        record = self._speakers.get(normalize_mac(address))
+        return record.last_seen if record else None
+
+    def entity_for(self, address):
+        """Return the live entity for a MAC address, or None."""
+        record = self._speakers.get(normalize_mac(address))
+        return record.entity if record else None
+
+    @callback
+    def async_set_last_used(self, address):
+        """Mark a speaker as the last used one and release the previous one's idle warm link."""
+        mac_address = normalize_mac(address)
+        previous, self.last_used = self.last_used, mac_address
+        if previous is not None and previous != mac_address:
+            entity = self.entity_for(previous)
+            if entity is not None:
+                entity.async_release_warm_link()
+
+    @callback
+    def async_release_missing(self, stale_after, now=None):
+        """Release idle warm links to speakers that have stopped advertising."""
+        if now is None:
+            now = time.monotonic()
+        for record in list(self._speakers.values()):
+            if record.entity is None or not record.connection:
+                continue
+            if record.last_seen is None or now - record.last_seen >= stale_after:
+                record.entity.async_release_warm_link(force=True)
+
+    @callback
+    def async_add_entry(self, entry):
+        """Index a config entry by its speaker's MAC address."""
+        mac_address = normalize_mac(entry.data.get(CONF_MAC_ADDRESS))
+        if not mac_address:
+            _LOGGER.warning(f"⚠️ Config entry {entry.entry_id} has no MAC address")
+            return None
+
+        record = self._speakers.get(mac_address)
+        if record is None:
+            record = self._speakers[mac_address] = RegisteredSpeaker(mac_address, entry.entry_id)
+            # Seed the handle from Home Assistant's cache so the first connect does not wait for an advert
+            record.ble_device = async_ble_device_from_address(self.hass, mac_address, connectable=True)
+        else:
+            record.entry_id = entry.entry_id
+
+        if self._cancel_callback is None:
+            self._cancel_callback = async_register_callback(
+                self.hass, self.async_on_advertisement, None, BluetoothScanningMode.PASSIVE
+            )
+        return record
+
+    @callback
+    def async_remove_entry(self, entry):
+        """Drop a config entry's speaker from the index."""
+        mac_address = normalize_mac(entry.data.get(CONF_MAC_ADDRESS))
+        record = self._speakers.get(mac_address)
+        if record is not None and record.entry_id == entry.entry_id:
+            del self._speakers[mac_address]
+            self._filter.forget(mac_address)
+
+        if not self._speakers and self._cancel_callback is not None:
+            self._cancel_callback()
+            self._cancel_callback = None
+
+    @callback
+    def async_attach_entity(self, address, entity):
+        """Link a speaker's live entity to its MAC address."""
+        record = self._speakers.get(normalize_mac(address))
+        if record is None:
+            _LOGGER.warning(f"⚠️ No configured speaker for {address}; entity not registered")
+            return None
+        record.entity = entity
+        return record
+
+    @callback
+    def async_detach_entity(self, address, entity):
+        """Unlink an entity that is being removed."""
+        record = self._speakers.get(normalize_mac(address))
+        if record is not None and record.entity is entity:
+            record.entity = None
+            record.connection = None
+
+    @callback
+    def async_on_advertisement(self, service_info, change):
+        """Handle a live advert: note the speaker as seen, then hand the advert to its entity."""
+        record = self._speakers.get(service_info.address)
+        if record is None:
+            return
+        self._async_note_advertisement(record, service_info)
+        self.async_dispatch_advertisement(service_info)
+
+    @callback
+    def _async_note_advertisement(self, record, service_info):
+        """Record when the speaker was heard, cache its latest handle and keep it warm if wanted."""
+        record.last_seen = time.monotonic()
+        if service_info.connectable and service_info.device is not None:
+            record.ble_device = service_info.device
+        if record.entity is not None and record.connection is None and record.entity.should_keep_warm:
+            record.entity.async_schedule_warm_up()
+
+    @callback
+    def async_dispatch_advertisement(self, service_info, adv_filter=None):
+        """Hand a changed advert to its speaker's entity; adv_filter defaults to the live filter."""
+        record = self._speakers.get(service_info.address)
+        if record is None or record.entity is None:
+            return
+        if (adv_filter or self._filter).should_emit(service_info):
+            record.entity.async_on_advertisement(service_info)
+
+def async_get_registry(hass):
+    """Return the speaker registry, creating it on first use."""
+    registry = hass.data.get(DATA_SPEAKER_REGISTRY)
+    if registry is None:
+        registry = hass.data[DATA_SPEAKER_REGISTRY] = SpeakerRegistry(hass)
+    return registry
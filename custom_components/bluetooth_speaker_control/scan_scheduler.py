@@ -0,0 +1,124 @@
+"""Open short, time-limited active discovery windows on top of passive discovery."""
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.components.bluetooth import BluetoothScanningMode
+
+from .const import (
+    DATA_PASSIVE_SCANNING,
+    DATA_SCAN_SCHEDULER,
+    DEFAULT_ACTIVE_BURST_DURATION,
+    DEFAULT_MISSING_SPEAKER_COOLDOWN,
+    DEFAULT_DEVICE_STALE_AFTER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+REASON_CONFIG_FLOW = "config_flow"
+REASON_MISSING_SPEAKER = "missing_speaker"
+REASON_USER_SCAN = "user_scan"
+
+
+class ScanScheduler:
+    """Keep discovery passive, with short time-limited active windows.
+
+    While a window is open, discovery only lists connectable devices (the ones
+    that answer scan requests) and waits for their scan responses before
+    reading Home Assistant's device list. Home Assistant gives integrations no
+    way to switch an adapter's scanning mode (the mode argument of
+    async_register_callback is unused), so the adapters keep whatever mode the
+    Bluetooth integration configured.
+    """
+
+    def __init__(self, hass: HomeAssistant, burst_duration=DEFAULT_ACTIVE_BURST_DURATION):
+        """Initialize the scheduler in passive mode."""
+        self.hass = hass
+        self.burst_duration = burst_duration
+        self._burst_until = 0.0
+        self._opened_at = None
+        self._reasons = set()
+        self._cancel_revert = None
+        self._last_missing_burst = {}  # MAC -> monotonic time of the last request for it
+        hass.data[DATA_PASSIVE_SCANNING] = True
+
+    @property
+    def is_active(self):
+        """Return True while an active window is open."""
+        return not self.hass.data.get(DATA_PASSIVE_SCANNING, True)
+
+    @property
+    def mode(self):
+        """Return the scanning mode currently requested."""
+        return BluetoothScanningMode.ACTIVE if self.is_active else BluetoothScanningMode.PASSIVE
+
+    @property
+    def active_for(self):
+        """Return how many seconds the current active window has been open, or None while passive."""
+        return time.monotonic() - self._opened_at if self._opened_at is not None else None
+
+    @callback
+    def async_request_active(self, reason, duration=None):
+        """Open or extend an active window, then revert to passive."""
+        duration = duration or self.burst_duration
+        burst_until = time.monotonic() + duration
+        self._reasons.add(reason)
+        if burst_until <= self._burst_until:
+            return
+
+        self._burst_until = burst_until
+        if not self.is_active:
+            _LOGGER.info(f"📶 Active discovery for {duration}s ({reason})")
+            self._opened_at = time.monotonic()
+            self.hass.data[DATA_PASSIVE_SCANNING] = False
+
+        if self._cancel_revert is not None:
+            self._cancel_revert()
+        self._cancel_revert = async_call_later(self.hass, duration, self._async_revert)
+
+    @callback
+    def async_check_missing_speakers(self, speakers, last_seen, now=None):
+        """Request an active window once per cooldown for any configured speaker not heard from recently.
+
+        speakers is an iterable of MAC addresses; last_seen returns a monotonic
+        timestamp for a MAC, or None if it has never been seen.
+        """
+        if now is None:
+            now = time.monotonic()
+        for mac_address in speakers:
+            seen_at = last_seen(mac_address)
+            if seen_at is not None and now - seen_at < DEFAULT_DEVICE_STALE_AFTER:
+                self._last_missing_burst.pop(mac_address, None)
+                continue
+            if now - self._last_missing_burst.get(mac_address, float("-inf")) < DEFAULT_MISSING_SPEAKER_COOLDOWN:
+                continue
+            self._last_missing_burst[mac_address] = now
+            _LOGGER.debug(f"🔎 Configured speaker {mac_address} is missing")
+            self.async_request_active(REASON_MISSING_SPEAKER)
+
+    @callback
+    def async_shutdown(self):
+        """Close any active window immediately."""
+        if self._cancel_revert is not None:
+            self._cancel_revert()
+        self._async_revert(None)
+
+    @callback
+    def _async_revert(self, now):
+        """Close the window and go back to passive discovery."""
+        self._cancel_revert = None
+        if self.is_active:
+            _LOGGER.info(f"📴 Back to passive discovery (requested for {', '.join(sorted(self._reasons))})")
+        self._burst_until = 0.0
+        self._opened_at = None
+        self._reasons.clear()
+        self.hass.data[DATA_PASSIVE_SCANNING] = True
+
+
+def async_get_scan_scheduler(hass):
+    """Return the scan scheduler, creating it on first use."""
+    scheduler = hass.data.get(DATA_SCAN_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_SCAN_SCHEDULER] = ScanScheduler(hass)
+    return scheduler